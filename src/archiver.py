@@ -1,13 +1,49 @@
 """Archive emails into compressed format."""
 
 import logging
-import shutil
-from pathlib import Path
+import os
+import tarfile
+import zipfile
+from collections.abc import Iterator
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Attachment types that are already compressed; deflating them again burns CPU
+# for little or no size reduction, so they are stored as-is in ZIP archives.
+_STORED_SUFFIXES = frozenset({
+    '.7z', '.avi', '.bz2', '.docx', '.gif', '.gz', '.heic', '.jpeg', '.jpg',
+    '.m4a', '.mov', '.mp3', '.mp4', '.odp', '.ods', '.odt', '.pdf', '.png',
+    '.pptx', '.rar', '.webm', '.webp', '.xlsx', '.xz', '.zip', '.zst',
+})
+
+# tarfile write mode and file extension for each tar-based archive format
+_TAR_MODES = {
+    'tar': ('w', '.tar'),
+    'gztar': ('w:gz', '.tar.gz'),
+    'bztar': ('w:bz2', '.tar.bz2'),
+    'xztar': ('w:xz', '.tar.xz'),
+}
+
+
+def _iter_files(root: Path) -> Iterator[Path]:
+    """
+    Yield regular files under root, depth-first in name order.
+
+    Uses os.scandir so file types come from the directory listing rather
+    than a separate stat call per entry. Symlinks are not followed.
+    """
+    with os.scandir(root) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_files(entry.path)
+        elif entry.is_file(follow_symlinks=False):
+            yield Path(entry.path)
+
 
 class Archiver:
     """Create compressed archives of downloaded emails."""
@@ -20,15 +56,22 @@ class Archiver:
         self,
         source_dir: Path,
         password: Optional[str] = None,
-        archive_format: str = 'zip'
+        archive_format: str = '7z',
+        compression_level: int = 1,
+        zstd_level: int = 3
     ) -> Path:
         """
         Create archive of email directory.
 
+        Only 7z archives are encrypted; the password is ignored for the
+        other formats.
+
         Args:
             source_dir: Directory to archive
-            password: Optional password for encryption
-            archive_format: Archive format (zip, tar, gztar, bztar, xztar)
+            password: Optional password for encryption (7z only)
+            archive_format: Archive format (7z, zip, tar, gztar, bztar, xztar, zstdtar)
+            compression_level: Compression level (0-9, up to 22 for zstdtar)
+            zstd_level: zstd level for 7z archives (1-22, 0 keeps LZMA2)
 
         Returns:
             Path to created archive
@@ -40,37 +83,155 @@ class Archiver:
         logger.info(f"Creating {archive_format} archive: {archive_name}")
 
         try:
-            if archive_format == 'zip' and password:
-                # For password-protected ZIP, we need pyminizip or py7zr
-                # Using py7zr for better security
-                return self._create_7z_archive(source_dir, archive_path, password)
-            else:
-                # Use shutil for standard archives
-                final_path = shutil.make_archive(
-                    str(archive_path),
-                    archive_format,
-                    source_dir
+            if archive_format == '7z':
+                # Using py7zr for AES-256 encryption
+                return self._create_7z_archive(
+                    source_dir, archive_path, password, compression_level, zstd_level
                 )
-                logger.info(f"Archive created: {final_path}")
-                return Path(final_path)
+            elif archive_format == 'zip':
+                return self._create_zip_archive(source_dir, archive_path, compression_level)
+            elif archive_format == 'zstdtar':
+                return self._create_zstd_tar_archive(source_dir, archive_path, compression_level)
+            elif archive_format in _TAR_MODES:
+                return self._create_tar_archive(
+                    source_dir, archive_path, archive_format, compression_level
+                )
+            else:
+                raise ValueError(f"Unsupported archive format: {archive_format}")
 
         except Exception as e:
             logger.error(f"Error creating archive: {e}")
             raise
 
+    def _create_zip_archive(
+        self,
+        source_dir: Path,
+        archive_path: Path,
+        level: int = 6
+    ) -> Path:
+        """
+        Create ZIP archive, skipping DEFLATE for already-compressed files.
+
+        Args:
+            source_dir: Directory to archive
+            archive_path: Path for archive (without extension)
+            level: DEFLATE compression level (0-9)
+
+        Returns:
+            Path to created archive
+        """
+        final_path = archive_path.with_suffix('.zip')
+
+        with zipfile.ZipFile(
+            final_path,
+            'w',
+            compression=zipfile.ZIP_DEFLATED,
+            compresslevel=level
+        ) as archive:
+            for file_path in _iter_files(source_dir):
+                arcname = file_path.relative_to(source_dir)
+                if file_path.suffix.lower() in _STORED_SUFFIXES:
+                    archive.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+                else:
+                    archive.write(file_path, arcname)
+
+        logger.info(f"Archive created: {final_path}")
+        return final_path
+
+    def _create_tar_archive(
+        self,
+        source_dir: Path,
+        archive_path: Path,
+        archive_format: str,
+        level: int = 1
+    ) -> Path:
+        """
+        Create (optionally compressed) tar archive.
+
+        Args:
+            source_dir: Directory to archive
+            archive_path: Path for archive (without extension)
+            archive_format: One of tar, gztar, bztar, xztar
+            level: Compression level (0-9; ignored for plain tar)
+
+        Returns:
+            Path to created archive
+        """
+        mode, extension = _TAR_MODES[archive_format]
+        final_path = Path(f"{archive_path}{extension}")
+
+        if archive_format == 'xztar':
+            options = {'preset': level}
+        elif archive_format == 'bztar':
+            options = {'compresslevel': max(level, 1)}
+        elif archive_format == 'gztar':
+            options = {'compresslevel': level}
+        else:
+            options = {}
+
+        with tarfile.open(final_path, mode, **options) as archive:
+            archive.add(source_dir, arcname='.')
+
+        logger.info(f"Archive created: {final_path}")
+        return final_path
+
+    def _create_zstd_tar_archive(
+        self,
+        source_dir: Path,
+        archive_path: Path,
+        level: int = 1
+    ) -> Path:
+        """
+        Create tar archive compressed with multithreaded zstd (.tar.zst).
+
+        Args:
+            source_dir: Directory to archive
+            archive_path: Path for archive (without extension)
+            level: zstd compression level (1-22)
+
+        Returns:
+            Path to created archive
+        """
+        try:
+            import pyzstd
+        except ImportError:
+            logger.warning("pyzstd not available, falling back to gztar")
+            return self._create_tar_archive(source_dir, archive_path, 'gztar', min(level, 9))
+
+        final_path = Path(f"{archive_path}.tar.zst")
+        options = {
+            pyzstd.CParameter.compressionLevel: level,
+            pyzstd.CParameter.nbWorkers: os.cpu_count() or 1,
+        }
+
+        with pyzstd.ZstdFile(final_path, 'w', level_or_option=options) as compressed:
+            with tarfile.open(fileobj=compressed, mode='w|') as archive:
+                archive.add(source_dir, arcname='.')
+
+        logger.info(f"Archive created: {final_path}")
+        return final_path
+
     def _create_7z_archive(
         self,
         source_dir: Path,
         archive_path: Path,
-        password: str
+        password: Optional[str],
+        level: int = 1,
+        zstd_level: int = 3
     ) -> Path:
         """
-        Create password-protected 7z archive.
+        Create 7z archive, encrypted when a password is given.
+
+        Uses zstd instead of the default LZMA2 codec unless zstd_level is 0.
+        zstd is many times faster, but extracting requires a zstd-capable
+        7z tool (py7zr, 7-Zip-zstd, or p7zip with the zstd plugin).
 
         Args:
             source_dir: Directory to archive
             archive_path: Path for archive (without extension)
-            password: Password for encryption
+            password: Optional password for encryption
+            level: Compression level for the unencrypted ZIP fallback
+            zstd_level: zstd compression level (1-22, 0 keeps LZMA2)
 
         Returns:
             Path to created archive
@@ -80,21 +241,29 @@ class Archiver:
 
             final_path = archive_path.with_suffix('.7z')
 
+            filters = None
+            if zstd_level:
+                filters = [{'id': py7zr.FILTER_ZSTD, 'level': zstd_level}]
+                if password:
+                    filters.append({'id': py7zr.FILTER_CRYPTO_AES256_SHA256})
+
             with py7zr.SevenZipFile(
                 final_path,
                 'w',
+                filters=filters,
                 password=password
             ) as archive:
-                # Add all files from source directory
-                for file_path in source_dir.rglob('*'):
-                    if file_path.is_file():
-                        arcname = file_path.relative_to(source_dir)
-                        archive.write(file_path, arcname)
+                # Add the contents of source directory, keeping paths relative
+                # to it; writeall walks each subtree inside py7zr. Files are
+                # streamed through the compressor in fixed-size blocks, so
+                # large attachments are never loaded into memory whole.
+                for entry in sorted(source_dir.iterdir()):
+                    archive.writeall(entry, arcname=entry.name)
 
-            logger.info(f"Encrypted 7z archive created: {final_path}")
+            kind = "Encrypted 7z" if password else "7z"
+            logger.info(f"{kind} archive created: {final_path}")
             return final_path
 
         except ImportError:
             logger.warning("py7zr not available, falling back to unencrypted zip")
-            final_path = shutil.make_archive(str(archive_path), 'zip', source_dir)
-            return Path(final_path)
+            return self._create_zip_archive(source_dir, archive_path, level)
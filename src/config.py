@@ -6,7 +6,16 @@ from typing import Optional
 from dataclasses import dataclass
 
 
-@dataclass
+# Environment values accepted as "enabled" for boolean settings (any case)
+_BOOL_TRUE = frozenset({"true", "1", "yes", "on"})
+
+
+def _truthy(value: str) -> bool:
+    """Return True if an environment value means "enabled"."""
+    return value in _BOOL_TRUE or value.lower() in _BOOL_TRUE
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
     """Application configuration."""
 
@@ -16,45 +25,56 @@ class Config:
 
     # Output settings
     output_dir: Path
+    seen_db_path: Path
     archive_enabled: bool
     archive_password: Optional[str]
+    archive_format: str
+    archive_compression_level: int
+    archive_zstd_level: int
 
     # Download settings
     max_results: Optional[int]
     include_attachments: bool
     delete_after_download: bool
+    concurrency: int
+    batch_size: int
+    full_resync: bool
 
     # Query settings
     query: str
 
     # Rate limiting settings
     requests_per_second: float
+    min_requests_per_second: float
+    max_requests_per_second: float
     max_retries: int
 
     @classmethod
     def from_env(cls) -> "Config":
         """Load configuration from environment variables."""
+        env = os.environ
+
         # Detect if running in container or locally
         # In container: use /data (mounted volume)
         # Locally: use ./data (current directory)
         default_data_dir = "/data" if os.path.exists("/.dockerenv") else "./data"
-        base_dir = Path(os.getenv("DATA_DIR", default_data_dir))
+        base_dir = Path(env.get("DATA_DIR", default_data_dir))
 
         # Create base_dir if it doesn't exist (for local runs)
         base_dir.mkdir(parents=True, exist_ok=True)
 
         # Credentials can be mounted as Docker secrets
-        creds_path = Path(os.getenv("CREDENTIALS_PATH", "/run/secrets/gmail_credentials"))
+        creds_path = Path(env.get("CREDENTIALS_PATH", "/run/secrets/gmail_credentials"))
         if not creds_path.exists():
             # Fallback to .env location
-            creds_path = Path(os.getenv("CREDENTIALS_PATH", "./credentials.json"))
+            creds_path = Path(env.get("CREDENTIALS_PATH", "./credentials.json"))
 
         token_path = base_dir / "token.json"
         output_dir = base_dir / "emails"
 
         # Archive password - support both direct env var and file (Docker secrets)
-        archive_password = os.getenv("ARCHIVE_PASSWORD")
-        archive_password_file = os.getenv("ARCHIVE_PASSWORD_FILE")
+        archive_password = env.get("ARCHIVE_PASSWORD")
+        archive_password_file = env.get("ARCHIVE_PASSWORD_FILE")
 
         if not archive_password and archive_password_file:
             # Try to read from file (Docker secret)
@@ -62,18 +82,33 @@ class Config:
             if password_path.exists():
                 archive_password = password_path.read_text().strip()
 
+        requests_per_second = float(env.get("REQUESTS_PER_SECOND", "10.0"))
+
         return cls(
             credentials_path=creds_path,
             token_path=token_path,
             output_dir=output_dir,
-            archive_enabled=os.getenv("ARCHIVE_ENABLED", "false").lower() == "true",
+            seen_db_path=base_dir / "seen.db",
+            archive_enabled=_truthy(env.get("ARCHIVE_ENABLED", "false")),
             archive_password=archive_password,
-            max_results=int(os.getenv("MAX_RESULTS", "0")) or None,
-            include_attachments=os.getenv("INCLUDE_ATTACHMENTS", "true").lower() == "true",
-            delete_after_download=os.getenv("DELETE_AFTER_DOWNLOAD", "false").lower() == "true",
-            query=os.getenv("GMAIL_QUERY", "in:anywhere"),
-            requests_per_second=float(os.getenv("REQUESTS_PER_SECOND", "10.0")),
-            max_retries=int(os.getenv("MAX_RETRIES", "5")),
+            archive_format=env.get("ARCHIVE_FORMAT", "7z").lower(),
+            archive_compression_level=int(env.get("ARCHIVE_LEVEL", "1")),
+            archive_zstd_level=int(env.get("ARCHIVE_ZSTD_LEVEL", "3")),
+            max_results=int(env.get("MAX_RESULTS", "0")) or None,
+            include_attachments=_truthy(env.get("INCLUDE_ATTACHMENTS", "true")),
+            delete_after_download=_truthy(env.get("DELETE_AFTER_DOWNLOAD", "false")),
+            concurrency=int(env.get("CONCURRENCY", "8")),
+            batch_size=int(env.get("BATCH_SIZE", "50")),
+            full_resync=_truthy(env.get("FULL_RESYNC", "false")),
+            query=env.get("GMAIL_QUERY", "in:anywhere"),
+            requests_per_second=requests_per_second,
+            min_requests_per_second=float(
+                env.get("MIN_REQUESTS_PER_SECOND", str(min(1.0, requests_per_second)))
+            ),
+            max_requests_per_second=float(
+                env.get("MAX_REQUESTS_PER_SECOND", str(requests_per_second))
+            ),
+            max_retries=int(env.get("MAX_RETRIES", "5")),
         )
 
     def validate(self) -> list[str]:
@@ -83,8 +118,26 @@ class Config:
         if not self.credentials_path.exists():
             errors.append(f"Credentials file not found: {self.credentials_path}")
 
-        if self.archive_enabled and not self.archive_password:
-            errors.append("Archive password required when archiving is enabled")
+        if self.archive_format not in ("7z", "zip", "tar", "gztar", "bztar", "xztar", "zstdtar"):
+            errors.append(
+                f"ARCHIVE_FORMAT must be one of 7z, zip, tar, gztar, bztar, xztar, zstdtar "
+                f"(got {self.archive_format!r})"
+            )
+        elif self.archive_enabled and self.archive_format == "7z":
+            if not self.archive_password:
+                errors.append("Archive password required when archiving to 7z (the default)")
+        elif self.archive_enabled and self.archive_password:
+            errors.append(
+                f"WARNING: ARCHIVE_FORMAT={self.archive_format} archives are not encrypted; "
+                "ARCHIVE_PASSWORD is ignored. Use ARCHIVE_FORMAT=7z for encryption."
+            )
+
+        max_level = 22 if self.archive_format == "zstdtar" else 9
+        if not 0 <= self.archive_compression_level <= max_level:
+            errors.append(f"ARCHIVE_LEVEL must be between 0 and {max_level}")
+
+        if not 0 <= self.archive_zstd_level <= 22:
+            errors.append("ARCHIVE_ZSTD_LEVEL must be between 0 and 22 (0 uses LZMA2)")
 
         if self.delete_after_download:
             errors.append(
@@ -102,7 +155,23 @@ class Config:
                 "Gmail API limit is 250 req/sec per user. Recommended: 10-50."
             )
 
+        if self.requests_per_second > 0 and not (
+            0 < self.min_requests_per_second
+            <= self.requests_per_second
+            <= self.max_requests_per_second
+        ):
+            errors.append(
+                "Rate limits must satisfy 0 < MIN_REQUESTS_PER_SECOND <= "
+                "REQUESTS_PER_SECOND <= MAX_REQUESTS_PER_SECOND"
+            )
+
         if self.max_retries < 0:
             errors.append("MAX_RETRIES must be >= 0")
 
+        if self.concurrency < 1:
+            errors.append("CONCURRENCY must be >= 1")
+
+        if not 1 <= self.batch_size <= 100:
+            errors.append("BATCH_SIZE must be between 1 and 100 (Gmail batch limit)")
+
         return errors
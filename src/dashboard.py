@@ -3,14 +3,11 @@
 import logging
 import time
 from datetime import datetime
-from pathlib import Path
-from typing import Optional
 
 from rich.console import Console
 from rich.layout import Layout
 from rich.live import Live
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeRemainingColumn
 from rich.table import Table
 from rich.text import Text
 from rich import box
@@ -18,6 +15,13 @@ from rich import box
 logger = logging.getLogger(__name__)
 
 
+def _format_hms(seconds: int) -> str:
+    """Format a duration in whole seconds as H:MM:SS."""
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
 class Dashboard:
     """Terminal dashboard for monitoring Gmail download progress."""
 
@@ -36,6 +40,33 @@ class Dashboard:
             'status': 'Initializing'
         }
 
+        # Progress callbacks can fire far faster than the screen refreshes;
+        # only rebuild the stats panel when something changed and at most
+        # every _render_interval seconds
+        self._render_interval = 0.25
+        self._last_render = 0.0
+        self._dirty = False
+        self._last_elapsed_secs = -1
+        self._last_elapsed_str = ''
+
+        # Configuration is immutable for the whole run, so format the
+        # derived display strings once instead of on every frame
+        query_display = config.query
+        if len(query_display) > 30:
+            query_display = query_display[:27] + "..."
+        self._query_display = query_display
+
+        output_display = str(config.output_dir)
+        if len(output_display) > 30:
+            output_display = "..." + output_display[-27:]
+        self._output_display = output_display
+
+        self._creds_status = (
+            "Using Docker secrets"
+            if str(config.credentials_path).startswith("/run/secrets")
+            else "Using .env file"
+        )
+
     def create_layout(self) -> Layout:
         """Create the dashboard layout."""
         layout = Layout()
@@ -99,12 +130,18 @@ class Dashboard:
 
         # Timing
         if self.stats['start_time']:
-            elapsed = (self.stats['end_time'] or datetime.now()) - self.stats['start_time']
-            elapsed_str = str(elapsed).split('.')[0]  # Remove microseconds
-            table.add_row("Elapsed Time", elapsed_str)
-
-            if self.stats['downloaded_emails'] > 0:
-                emails_per_sec = self.stats['downloaded_emails'] / elapsed.total_seconds()
+            now = self.stats['end_time'] or datetime.now()
+            elapsed = (now - self.stats['start_time']).total_seconds()
+
+            # The display only changes once per second; reuse the string
+            secs = int(elapsed)
+            if secs != self._last_elapsed_secs:
+                self._last_elapsed_secs = secs
+                self._last_elapsed_str = _format_hms(secs)
+            table.add_row("Elapsed Time", self._last_elapsed_str)
+
+            if self.stats['downloaded_emails'] > 0 and elapsed > 0:
+                emails_per_sec = self.stats['downloaded_emails'] / elapsed
                 table.add_row("Speed", f"{emails_per_sec:.2f} emails/sec")
 
         return Panel(
@@ -120,21 +157,25 @@ class Dashboard:
         table.add_column("Setting", style="cyan", width=20)
         table.add_column("Value", style="yellow")
 
-        # Query
-        query_display = self.config.query
-        if len(query_display) > 30:
-            query_display = query_display[:27] + "..."
-        table.add_row("Query", query_display)
-
-        # Output
-        output_display = str(self.config.output_dir)
-        if len(output_display) > 30:
-            output_display = "..." + output_display[-27:]
-        table.add_row("Output Dir", output_display)
+        table.add_row("Query", self._query_display)
+        table.add_row("Output Dir", self._output_display)
 
         # Settings
         table.add_row("Attachments", "Yes" if self.config.include_attachments else "No")
-        table.add_row("Archive", "Yes" if self.config.archive_enabled else "No")
+        if self.config.archive_enabled and self.config.archive_format == "7z":
+            codec = (
+                f"zstd {self.config.archive_zstd_level}"
+                if self.config.archive_zstd_level else "LZMA2"
+            )
+            archive_display = f"Yes (7z, {codec}, encrypted)"
+        elif self.config.archive_enabled:
+            archive_display = (
+                f"Yes ({self.config.archive_format}, "
+                f"level {self.config.archive_compression_level}, unencrypted)"
+            )
+        else:
+            archive_display = "No"
+        table.add_row("Archive", archive_display)
 
         max_results_display = str(self.config.max_results) if self.config.max_results else "All"
         table.add_row("Max Results", max_results_display)
@@ -164,8 +205,7 @@ class Dashboard:
         help_text.append("Local storage only", style="green")
         help_text.append(" | ")
 
-        creds_status = "Using Docker secrets" if str(self.config.credentials_path).startswith("/run/secrets") else "Using .env file"
-        help_text.append(creds_status, style="yellow")
+        help_text.append(self._creds_status, style="yellow")
 
         return Panel(
             help_text,
@@ -175,7 +215,9 @@ class Dashboard:
 
     def update_stats(self, stats: dict) -> None:
         """Update dashboard statistics."""
-        self.stats.update(stats)
+        if any(self.stats.get(key) != value for key, value in stats.items()):
+            self.stats.update(stats)
+            self._dirty = True
 
     def render(self, layout: Layout) -> None:
         """Render all dashboard components."""
@@ -184,6 +226,14 @@ class Dashboard:
         layout["config"].update(self.render_config())
         layout["footer"].update(self.render_footer())
 
+    def _render_stats_only(self, layout: Layout) -> None:
+        """Re-render the statistics panel if stats changed since the last render."""
+        if not self._dirty:
+            return
+        layout["stats"].update(self.render_stats())
+        self._dirty = False
+        self._last_render = time.monotonic()
+
     def run_live(self, download_func):
         """
         Run dashboard in live mode while downloading.
@@ -197,7 +247,14 @@ class Dashboard:
 
         def progress_callback(stats):
             """Update dashboard with download progress."""
+            if time.monotonic() - self._last_render < self._render_interval:
+                return
             self.update_stats(stats)
+            self._render_stats_only(layout)
+
+        # Header, config and footer never change during a run, so build
+        # them once; only the statistics panel is refreshed afterwards
+        self.render(layout)
 
         try:
             # Disable refresh in non-TTY environments
@@ -206,30 +263,25 @@ class Dashboard:
 
             with Live(
                 layout,
-                refresh_per_second=4 if is_tty else 1,
+                refresh_per_second=2 if is_tty else 1,
                 console=self.console,
                 transient=False
             ):
-                # Initial render
-                self.render(layout)
                 time.sleep(0.5)
 
                 # Run download with progress updates
                 result = download_func(progress_callback=progress_callback)
 
                 # Update final stats
-                self.stats['end_time'] = datetime.now()
-                self.stats['status'] = 'Complete'
-                self.update_stats(result)
-                self.render(layout)
+                self.update_stats({**result, 'status': 'Complete', 'end_time': datetime.now()})
+                self._render_stats_only(layout)
 
                 # Keep dashboard visible for a moment
                 time.sleep(2)
 
         except KeyboardInterrupt:
-            self.stats['status'] = 'Cancelled'
-            self.stats['end_time'] = datetime.now()
-            self.render(layout)
+            self.update_stats({'status': 'Cancelled', 'end_time': datetime.now()})
+            self._render_stats_only(layout)
             self.console.print("\n[yellow]Download cancelled by user[/yellow]")
 
         return self.stats
@@ -1,19 +1,64 @@
 """Email downloader for saving Gmail messages to disk."""
 
-import base64
+import email
+import email.policy
 import json
 import logging
-from datetime import datetime
+import os
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from email.message import EmailMessage
 from pathlib import Path
-from typing import Optional, Callable
-import email
-from email.message import Message
+from typing import Optional
 
 from .config import Config
-from .gmail_client import GmailClient, parse_email_date, sanitize_filename
+from .fileio import dump_json, write_bytes
+from .gmail_client import GmailClient, decode_b64url, parse_email_date, sanitize_filename
+from .seen_index import SeenIndex
 
 logger = logging.getLogger(__name__)
 
+# MIME types saved as message bodies, and the file extension used for each
+_BODY_MIMES = frozenset({'text/plain', 'text/html'})
+_EXT_BY_MIME = {'text/plain': 'txt', 'text/html': 'html'}
+
+# Headers copied into metadata.json; everything else (Received, DKIM, ARC...)
+# is skipped when reading the header list
+_WANTED_HEADERS = frozenset({'Subject', 'Date', 'From', 'To', 'Cc'})
+
+# Query matching every message; only this query can be synced from mailbox history
+_ALL_MAIL_QUERY = 'in:anywhere'
+
+def _claim_name(used_names: set[str], subdir: str, filename: str) -> str:
+    """
+    Pick a file name not yet used in a message directory.
+
+    Tries filename first, then name_1.ext, name_2.ext, ... Every message
+    gets a directory of its own (see EmailDownloader._make_message_dir),
+    so tracking the names handed out is enough and no filesystem checks
+    are needed.
+
+    Args:
+        used_names: Names already claimed for this message (updated in place)
+        subdir: Subdirectory prefix within the message directory ('' or 'attachments/')
+        filename: Preferred file name
+
+    Returns:
+        Free file name (without the subdirectory prefix)
+    """
+    name, _, ext = filename.rpartition('.')
+    if not name:
+        name, ext = filename, ''
+
+    candidate = filename
+    counter = 1
+    while subdir + candidate in used_names:
+        candidate = f"{name}_{counter}.{ext}" if ext else f"{filename}_{counter}"
+        counter += 1
+
+    used_names.add(subdir + candidate)
+    return candidate
+
 
 class EmailDownloader:
     """Downloads and saves Gmail messages to local filesystem."""
@@ -23,6 +68,8 @@ class EmailDownloader:
         self.config = config
         self.client = gmail_client
         self.config.output_dir.mkdir(parents=True, exist_ok=True)
+        # Message directories are built as strings on the hot path
+        self._output_dir_str = str(self.config.output_dir)
 
     def download_all(
         self,
@@ -31,6 +78,17 @@ class EmailDownloader:
         """
         Download all emails matching the query.
 
+        Message details are fetched in parallel batches by the client while
+        a bounded pool of save workers decodes and writes them, so network
+        waits overlap with disk writes; the client's rate limiter still
+        caps the aggregate request rate. The progress callback is always
+        invoked from the calling thread.
+
+        Messages recorded in the seen index by an earlier run are skipped
+        without fetching their details, unless config.full_resync is set.
+        After a complete run the mailbox historyId is saved, so the next
+        run can ask Gmail for just the messages added since then.
+
         Args:
             progress_callback: Optional callback for progress updates
 
@@ -40,55 +98,174 @@ class EmailDownloader:
         logger.info(f"Starting download with query: {self.config.query}")
         logger.info(f"Output directory: {self.config.output_dir}")
 
-        for msg_metadata in self.client.get_messages():
-            try:
-                # Fetch full message
-                message = self.client.get_message_detail(msg_metadata['id'])
-
-                # Save the message
-                self._save_message(message)
+        seen_index = SeenIndex(self.config.seen_db_path)
+        history_key = f"history_id:{self.config.query}"
 
-                self.client.increment_stat('downloaded_emails')
+        try:
+            # Taken before listing, so changes made during the run are
+            # picked up again next time
+            history_id = self.client.get_history_id()
 
-                # Optional progress callback
-                if progress_callback:
-                    progress_callback(self.client.get_stats())
+            msg_ids = self._list_message_ids(seen_index.get_meta(history_key))
+            if not self.config.full_resync:
+                msg_ids = seen_index.filter_unseen(msg_ids)
 
-                # Optional deletion
-                if self.config.delete_after_download:
-                    self.client.delete_message(msg_metadata['id'])
+            self._download_messages(msg_ids, seen_index, progress_callback)
 
-            except Exception as e:
-                logger.error(f"Error processing message {msg_metadata['id']}: {e}")
-                self.client.increment_stat('errors')
+            # Only a complete, error-free pass may become the next starting point
+            stats = self.client.get_stats()
+            if not self.config.max_results and not stats['errors']:
+                seen_index.set_meta(history_key, history_id)
+        finally:
+            self.client.update_stat('skipped_emails', seen_index.skipped)
+            seen_index.close()
 
         stats = self.client.get_stats()
         logger.info(f"Download complete: {stats}")
         return stats
 
-    def _save_message(self, message: dict) -> None:
+    def _list_message_ids(self, last_history_id: Optional[str]) -> Iterator[str]:
+        """
+        Get the IDs of messages to consider for download.
+
+        Uses the mailbox history since last_history_id when possible. The
+        history API cannot evaluate search queries, so this only applies
+        to the default all-mail query; otherwise, and on the first run, a
+        full resync, with MAX_RESULTS, or once the history has expired,
+        every message matching the query is listed.
+
+        Args:
+            last_history_id: historyId saved by the previous complete run
+
+        Returns:
+            Iterator of message IDs
+        """
+        if (
+            last_history_id
+            and self.config.query == _ALL_MAIL_QUERY
+            and not self.config.full_resync
+            and not self.config.max_results
+        ):
+            added = self.client.get_added_message_ids(last_history_id)
+            if added is not None:
+                logger.info(f"{len(added)} messages added since the last run")
+                self.client.update_stat('total_emails', len(added))
+                return iter(added)
+
+        return (msg_metadata['id'] for msg_metadata in self.client.get_messages())
+
+    def _download_messages(
+        self,
+        msg_ids: Iterator[str],
+        seen_index: SeenIndex,
+        progress_callback: Optional[Callable[[dict], None]]
+    ) -> None:
+        """
+        Fetch and save messages, recording each saved one in the seen index.
+
+        Args:
+            msg_ids: IDs of the messages to download
+            seen_index: Index of downloaded messages
+            progress_callback: Optional callback for progress updates
+        """
+        workers = self.config.concurrency
+        max_in_flight = workers * 2
+        # save future -> (message ID, history ID)
+        saving: dict[Future, tuple[str, Optional[str]]] = {}
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='save') as save_pool:
+
+            def collect(timeout: Optional[float] = None) -> None:
+                """Reap finished saves, waiting up to timeout for at least one."""
+                done, _ = wait(saving, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    msg_id, history_id = saving.pop(future)
+                    try:
+                        msg_dir = future.result()
+                    except Exception as e:
+                        logger.error(f"Error processing message {msg_id}: {e}")
+                        self.client.increment_stat('errors')
+                        continue
+
+                    seen_index.mark(msg_id, history_id, msg_dir)
+                    if progress_callback:
+                        progress_callback(self.client.get_stats())
+
+            for message in self.client.iter_message_details(msg_ids, workers=workers):
+                future = save_pool.submit(self._store_message, message)
+                saving[future] = (message['id'], message.get('historyId'))
+
+                # Bound the number of messages held in memory at once
+                collect(timeout=0)
+                while len(saving) >= max_in_flight:
+                    collect()
+
+            while saving:
+                collect()
+
+    def _store_message(self, message: dict) -> str:
+        """
+        Save a fetched message and optionally delete it from Gmail.
+
+        Args:
+            message: Gmail message object in raw or full format
+
+        Returns:
+            Directory the message was saved to
+        """
+        msg_dir = self._save_message(message)
+        self.client.increment_stat('downloaded_emails')
+
+        if self.config.delete_after_download:
+            self.client.delete_message(message['id'])
+
+        return msg_dir
+
+    def _save_message(self, message: dict) -> str:
         """
         Save a single message to disk.
 
         Args:
-            message: Full Gmail message object
+            message: Gmail message object in raw format (RFC 822 source in
+                'raw') or full format (MIME tree in 'payload')
+
+        Returns:
+            Directory the message was saved to
         """
         msg_id = message['id']
-        headers = {h['name']: h['value'] for h in message['payload']['headers']}
+        mime: Optional[EmailMessage] = None
+        headers = {}
+        if 'raw' in message:
+            mime = email.message_from_bytes(
+                decode_b64url(message['raw']),
+                policy=email.policy.default
+            )
+            for name in _WANTED_HEADERS:
+                value = mime.get(name)
+                if value is not None:
+                    headers[name] = str(value)
+        else:
+            for header in message['payload']['headers']:
+                name = header['name']
+                if name in _WANTED_HEADERS:
+                    headers[name] = header['value']
 
         # Extract metadata
         subject = headers.get('Subject', 'No Subject')
         date_str = headers.get('Date', '')
         from_addr = headers.get('From', 'Unknown')
 
-        # Parse date and create directory structure
+        # Parse date and create directory structure (year/month/day)
         date = parse_email_date(date_str)
-        date_path = self.config.output_dir / str(date.year) / f"{date.month:02d}" / f"{date.day:02d}"
 
         # Create safe directory name (limit to 50 to account for multi-byte UTF-8 chars)
         safe_subject = sanitize_filename(subject, max_length=50)
-        msg_dir = date_path / f"{date.strftime('%H%M%S')}_{safe_subject}_{msg_id[:8]}"
-        msg_dir.mkdir(parents=True, exist_ok=True)
+        msg_dir_str = self._make_message_dir(
+            f"{self._output_dir_str}/{date.year}/{date.month:02d}/{date.day:02d}/"
+            f"{date.hour:02d}{date.minute:02d}{date.second:02d}_{safe_subject}",
+            msg_id
+        )
+        msg_dir = Path(msg_dir_str)
 
         # Save metadata
         metadata = {
@@ -103,126 +280,176 @@ class EmailDownloader:
             'snippet': message.get('snippet', ''),
         }
 
-        with open(msg_dir / 'metadata.json', 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        write_bytes(msg_dir / 'metadata.json', dump_json(metadata))
 
         # Process message parts (body, attachments)
-        payload = message['payload']
-        self._process_parts(payload, msg_dir, msg_id)
+        if mime is not None:
+            self._process_mime_parts(mime, msg_dir, {'metadata.json'})
+        else:
+            self._process_payload_parts(message['payload'], msg_dir, {'metadata.json'})
 
         logger.debug(f"Saved message: {subject[:50]} ({msg_id})")
+        return msg_dir_str
+
+    def _make_message_dir(self, prefix: str, msg_id: str) -> str:
+        """
+        Create the directory a message is saved to.
+
+        The directory is normally prefix_<first 8 characters of the ID>.
+        Messages with the same subject, the same Date second and the same
+        ID prefix would share that directory and overwrite each other's
+        files, so if it already exists and does not hold this message from
+        an earlier run, prefix_<full ID> is used instead.
+
+        Args:
+            prefix: Directory path up to the ID suffix
+            msg_id: Gmail message ID
 
-    def _process_parts(self, payload: dict, msg_dir: Path, msg_id: str) -> None:
+        Returns:
+            Directory path
         """
-        Recursively process message parts (body, attachments).
+        msg_dir_str = f"{prefix}_{msg_id[:8]}"
+        try:
+            os.makedirs(msg_dir_str)
+            return msg_dir_str
+        except FileExistsError:
+            pass
+
+        try:
+            with open(f"{msg_dir_str}/metadata.json", 'rb') as f:
+                if json.load(f).get('id') == msg_id:
+                    # Re-download of a message saved by an earlier run
+                    return msg_dir_str
+        except (OSError, ValueError):
+            pass  # Not written yet by the message that claimed it, or unreadable
+
+        msg_dir_str = f"{prefix}_{msg_id}"
+        os.makedirs(msg_dir_str, exist_ok=True)
+        return msg_dir_str
+
+    def _process_mime_parts(
+        self,
+        mime: EmailMessage,
+        msg_dir: Path,
+        used_names: set[str]
+    ) -> None:
+        """
+        Process the parts (body, attachments) of a raw message depth-first.
+
+        Uses an explicit stack rather than recursion, so deeply nested
+        MIME trees cannot hit the recursion limit.
+
+        Args:
+            mime: Parsed message
+            msg_dir: Directory to save parts
+            used_names: File names already written for this message
+        """
+        stack = [mime]
+        while stack:
+            part = stack.pop()
+            if part.is_multipart():
+                # Multipart: reversed so parts are saved in document order
+                stack.extend(reversed(part.get_payload()))
+                continue
+
+            # Single part
+            filename = part.get_filename()
+            if filename and self.config.include_attachments:
+                content = part.get_payload(decode=True)
+                if content:
+                    self._write_attachment(filename, content, msg_dir, used_names)
+                continue
+
+            mime_type = part.get_content_type()
+            if mime_type in _BODY_MIMES:
+                self._write_body(mime_type, part.get_payload(decode=True), msg_dir, used_names)
+
+    def _process_payload_parts(
+        self,
+        payload: dict,
+        msg_dir: Path,
+        used_names: set[str]
+    ) -> None:
+        """
+        Process the body parts of a full-format message depth-first.
+
+        Full format is only fetched when attachments are not wanted (see
+        GmailClient._plan_fetches()), so attachment parts are skipped.
+        Uses an explicit stack rather than recursion, so deeply nested
+        MIME trees cannot hit the recursion limit.
 
         Args:
             payload: Message payload
             msg_dir: Directory to save parts
-            msg_id: Message ID for API calls
+            used_names: File names already written for this message
         """
-        if 'parts' in payload:
-            # Multipart message
-            for part in payload['parts']:
-                self._process_parts(part, msg_dir, msg_id)
-        else:
+        stack = [payload]
+        while stack:
+            part = stack.pop()
+            parts = part.get('parts')
+            if parts:
+                # Multipart: reversed so parts are saved in document order
+                stack.extend(reversed(parts))
+                continue
+
             # Single part
-            self._save_part(payload, msg_dir, msg_id)
+            mime_type = part.get('mimeType', '')
+            if mime_type in _BODY_MIMES:
+                data = part.get('body', {}).get('data', '')
+                if data:
+                    self._write_body(mime_type, decode_b64url(data), msg_dir, used_names)
 
-    def _save_part(self, part: dict, msg_dir: Path, msg_id: str) -> None:
+    def _write_body(
+        self,
+        mime_type: str,
+        content: Optional[bytes],
+        msg_dir: Path,
+        used_names: set[str]
+    ) -> None:
         """
-        Save a single message part.
+        Save a text/plain or text/html body part.
 
         Args:
-            part: Message part
+            mime_type: Part MIME type (one of _BODY_MIMES)
+            content: Decoded body
             msg_dir: Directory to save to
-            msg_id: Message ID
+            used_names: File names already written for this message
         """
-        mime_type = part.get('mimeType', '')
-        filename = part.get('filename', '')
-        body = part.get('body', {})
-
-        # Handle attachments
-        if filename and self.config.include_attachments:
-            self._save_attachment(part, msg_dir, msg_id)
+        if not content:
             return
 
-        # Handle text/html content
-        if mime_type in ['text/plain', 'text/html']:
-            data = body.get('data', '')
-            if data:
-                content = base64.urlsafe_b64decode(data).decode('utf-8', errors='replace')
+        # Save as appropriate file type; number repeats (body_1.txt, ...)
+        filename = _claim_name(used_names, '', f"body.{_EXT_BY_MIME[mime_type]}")
+        write_bytes(msg_dir / filename, content)
 
-                # Save as appropriate file type
-                ext = 'txt' if mime_type == 'text/plain' else 'html'
-                filename = f"body.{ext}"
-
-                # If both exist, number them
-                save_path = msg_dir / filename
-                counter = 1
-                while save_path.exists():
-                    filename = f"body_{counter}.{ext}"
-                    save_path = msg_dir / filename
-                    counter += 1
-
-                with open(save_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-
-    def _save_attachment(self, part: dict, msg_dir: Path, msg_id: str) -> None:
+    def _write_attachment(
+        self,
+        filename: str,
+        content: bytes,
+        msg_dir: Path,
+        used_names: set[str]
+    ) -> None:
         """
         Save an email attachment.
 
         Args:
-            part: Message part containing attachment
+            filename: Attachment file name from the part headers
+            content: Decoded attachment
             msg_dir: Directory to save to
-            msg_id: Message ID
+            used_names: File names already written for this message
         """
-        filename = part.get('filename', 'attachment')
         filename = sanitize_filename(filename)
 
-        attachment_id = part['body'].get('attachmentId')
-        size = part['body'].get('size', 0)
-
-        if not attachment_id:
-            # Inline attachment
-            data = part['body'].get('data', '')
-            if data:
-                content = base64.urlsafe_b64decode(data)
-        else:
-            # Download attachment from API with rate limiting
-            try:
-                request = self.client.service.users().messages().attachments().get(
-                    userId='me',
-                    messageId=msg_id,
-                    id=attachment_id
-                )
-                attachment = self.client._execute_with_backoff(
-                    request,
-                    f"get attachment {filename[:20]}"
-                )
-
-                data = attachment.get('data', '')
-                content = base64.urlsafe_b64decode(data)
-            except Exception as e:
-                logger.error(f"Error downloading attachment {filename}: {e}")
-                self.client.increment_stat('errors')
-                return
-
         # Save attachment
         attachments_dir = msg_dir / 'attachments'
-        attachments_dir.mkdir(exist_ok=True)
-
-        save_path = attachments_dir / filename
-        counter = 1
-        while save_path.exists():
-            name, ext = filename.rsplit('.', 1) if '.' in filename else (filename, '')
-            new_filename = f"{name}_{counter}.{ext}" if ext else f"{filename}_{counter}"
-            save_path = attachments_dir / new_filename
-            counter += 1
+        if 'attachments/' not in used_names:
+            attachments_dir.mkdir(exist_ok=True)
+            used_names.add('attachments/')
 
-        with open(save_path, 'wb') as f:
-            f.write(content)
+        save_path = attachments_dir / _claim_name(used_names, 'attachments/', filename)
+        write_bytes(save_path, content)
 
+        size = len(content)
         self.client.increment_stat('total_attachments')
         self.client.increment_stat('total_size_bytes', size)
 
@@ -0,0 +1,53 @@
+"""Low-level file writing and JSON helpers shared by the downloader and status writer."""
+
+import json
+import os
+from pathlib import Path
+
+try:
+    # Fast JSON encoder (optional); falls back to the stdlib json module
+    import orjson
+except ImportError:
+    orjson = None
+
+# Files at least this large get their extent reserved before writing
+_FALLOCATE_MIN_BYTES = 1024 * 1024
+
+
+def dump_json(data: dict) -> bytes:
+    """Serialize data as indented UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def write_bytes(path: Path | str, data: bytes, fsync: bool = False) -> None:
+    """
+    Write bytes to a file with unbuffered os.write calls.
+
+    Large files have their full size reserved up front with
+    posix_fallocate (where supported) so they are laid out contiguously.
+
+    Args:
+        path: Destination file (created or truncated)
+        data: Content to write
+        fsync: Flush the file to disk before returning
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        if len(data) >= _FALLOCATE_MIN_BYTES and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(fd, 0, len(data))
+            except OSError:
+                pass  # Filesystem doesn't support it; plain write still works
+
+        # os.write may write less than requested for very large buffers
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -1,20 +1,33 @@
 """Gmail API client for fetching emails."""
 
-import base64
-import email
+import binascii
+import logging
 import os
+import random
+import threading
 import time
-from datetime import datetime
-from pathlib import Path
-from typing import Optional, Iterator
-import logging
-
+from array import array
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import UTC, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime, parsedate_tz
+from functools import lru_cache
+from typing import Optional
+
+import google_auth_httplib2
+import httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+try:
+    # SIMD-accelerated base64 (optional)
+    import pybase64
+except ImportError:
+    pybase64 = None
+
 from .config import Config
 
 logger = logging.getLogger(__name__)
@@ -23,35 +36,111 @@ logger = logging.getLogger(__name__)
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly',
           'https://www.googleapis.com/auth/gmail.modify']
 
+# Socket timeout (seconds) for Gmail API connections
+HTTP_TIMEOUT = 60
+
+# Maps the URL-safe base64 alphabet back to the standard one
+_URL_SAFE_TABLE = str.maketrans('-_', '+/')
+
+# Download statistics, in the order they are stored in GmailClient's counter array
+_STAT_NAMES = (
+    'total_emails',
+    'downloaded_emails',
+    'skipped_emails',
+    'total_attachments',
+    'total_size_bytes',
+    'errors',
+    'rate_limit_hits',
+    'retries',
+)
+_STAT_INDEX = {name: index for index, name in enumerate(_STAT_NAMES)}
+
+# Characters that are unsafe in file names, mapped to '_' by sanitize_filename
+_UNSAFE_TABLE = str.maketrans('<>:"/\\|?*\x00', '_' * 10)
+# Characters trimmed from both ends of file names
+_STRIP_CHARS = '. '
+
+# Raw batches carry whole messages, attachments included, so fewer of them
+# are kept in flight than format='full' batches to bound memory use
+_RAW_BATCHES_IN_FLIGHT = 2
+
+# Adaptive rate control (AIMD): add 1 req/sec after this many successful calls,
+# as long as the smoothed 429 rate stays below the threshold
+RATE_INCREASE_AFTER = 100
+RATE_INCREASE_MAX_THROTTLE = 0.01
+THROTTLE_EWMA_ALPHA = 0.05
+# Concurrent 429s from the same burst only halve the rate once per this many seconds
+RATE_DECREASE_COOLDOWN = 1.0
+
 
 class RateLimiter:
-    """Simple rate limiter using token bucket algorithm."""
+    """Thread-safe rate limiter using the token bucket algorithm."""
 
-    def __init__(self, requests_per_second: float = 10.0):
+    def __init__(self, requests_per_second: float = 10.0, capacity: Optional[float] = None):
         """
         Initialize rate limiter.
 
+        Tokens refill continuously at requests_per_second up to capacity, so
+        a short burst can run faster than the steady rate after idle time.
+
         Args:
-            requests_per_second: Maximum requests per second (default: 10)
+            requests_per_second: Maximum sustained requests per second (default: 10)
+            capacity: Bucket size / burst allowance (default: 2 seconds' worth)
         """
         self.requests_per_second = requests_per_second
-        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0
-        self.last_request_time = 0.0
+        self.capacity = capacity if capacity is not None else max(requests_per_second * 2, 1.0)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
 
-    def wait_if_needed(self) -> None:
-        """Wait if necessary to maintain rate limit."""
-        if self.min_interval <= 0:
-            return  # Rate limiting disabled
+    def acquire(self, n: int = 1) -> float:
+        """
+        Take n tokens, sleeping until they are available.
+
+        Requests larger than the bucket (e.g. a big batch) are allowed to
+        drive it negative; later callers then wait for that debt too. The
+        sleep happens outside the lock so waiting threads don't block
+        each other's bookkeeping.
 
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
+        Args:
+            n: Number of API calls the upcoming request counts as
+
+        Returns:
+            Seconds slept
+        """
+        if self.requests_per_second <= 0:
+            return 0.0  # Rate limiting disabled
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.last_refill) * self.requests_per_second
+            )
+            self.last_refill = now
+            self.tokens -= n
+            sleep_time = -self.tokens / self.requests_per_second if self.tokens < 0 else 0.0
 
-        if elapsed < self.min_interval:
-            sleep_time = self.min_interval - elapsed
+        if sleep_time > 0:
             logger.debug(f"Rate limiting: sleeping {sleep_time:.3f}s")
             time.sleep(sleep_time)
 
-        self.last_request_time = time.time()
+        return sleep_time
+
+    def set_rate(self, requests_per_second: float) -> None:
+        """
+        Change the sustained rate (and burst capacity) at runtime.
+
+        Args:
+            requests_per_second: New maximum sustained requests per second
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens += (now - self.last_refill) * self.requests_per_second
+            self.last_refill = now
+            self.requests_per_second = requests_per_second
+            self.capacity = max(requests_per_second * 2, 1.0)
+            self.tokens = min(self.tokens, self.capacity)
 
 
 class GmailClient:
@@ -62,15 +151,17 @@ class GmailClient:
         self.config = config
         self.service = None
         self.rate_limiter = RateLimiter(config.requests_per_second)
-        self._stats = {
-            'total_emails': 0,
-            'downloaded_emails': 0,
-            'total_attachments': 0,
-            'total_size_bytes': 0,
-            'errors': 0,
-            'rate_limit_hits': 0,
-            'retries': 0
-        }
+        # Backoff before each retry, doubling from 1 second
+        self._retry_delays = [1.0 * (1 << attempt) for attempt in range(config.max_retries + 1)]
+        self._rate_lock = threading.Lock()
+        self._successes_since_change = 0
+        self._throttle_ewma = 0.0
+        self._last_decrease = 0.0
+        self._credentials = None
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        # 64-bit counters indexed via _STAT_INDEX
+        self._stats = array('q', [0] * len(_STAT_NAMES))
 
     def authenticate(self, use_local_server: bool = True) -> None:
         """
@@ -192,16 +283,47 @@ class GmailClient:
                 token.write(creds.to_json())
             logger.info(f"Credentials saved to {self.config.token_path}")
 
-        self.service = build('gmail', 'v1', credentials=creds)
+        self._credentials = creds
+        # Build on the calling thread's pooled transport rather than letting
+        # build() create a separate, unpooled one
+        self.service = build('gmail', 'v1', http=self._http())
         logger.info("Successfully authenticated with Gmail API")
 
-    def _execute_with_backoff(self, request, operation_name: str = "API call"):
+    def _http(self) -> google_auth_httplib2.AuthorizedHttp:
+        """
+        Get the authorized HTTP transport for the calling thread.
+
+        httplib2 connections are not thread-safe, so each thread gets its
+        own transport sharing the same credentials. The transport is kept
+        for the life of the thread, so its keep-alive connection to the
+        API is reused across requests instead of re-doing the TLS handshake.
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(
+                self._credentials,
+                http=httplib2.Http(cache=None, timeout=HTTP_TIMEOUT)
+            )
+            self._local.http = http
+        return http
+
+    def _execute_with_backoff(
+        self,
+        request,
+        operation_name: str = "API call",
+        cost: int = 1,
+        report_success: bool = True
+    ):
         """
         Execute API request with exponential backoff on rate limit errors.
 
         Args:
-            request: Google API request object
+            request: Google API request object (or batch request)
             operation_name: Description of operation for logging
+            cost: Number of API calls the request counts as for rate limiting
+            report_success: Count a successful response towards raising the
+                request rate. Batch callers pass False and report the
+                sub-requests that actually succeeded themselves.
 
         Returns:
             API response
@@ -210,29 +332,35 @@ class GmailClient:
             HttpError: If max retries exceeded or non-retryable error
         """
         max_retries = self.config.max_retries
-        base_delay = 1.0  # Start with 1 second
 
         for attempt in range(max_retries + 1):
             try:
                 # Apply rate limiting
-                self.rate_limiter.wait_if_needed()
+                self.rate_limiter.acquire(cost)
 
                 # Execute request
-                return request.execute()
+                response = request.execute(http=self._http())
+                if report_success:
+                    self._on_success(cost)
+                return response
 
             except HttpError as error:
+                if error.resp.status == 429:
+                    self._on_429()
+
                 # Check if it's a rate limit error (429) or server error (500, 503)
                 if error.resp.status in [429, 500, 503]:
                     if attempt < max_retries:
-                        # Calculate exponential backoff delay
-                        delay = base_delay * (2 ** attempt)
+                        # Exponential backoff with jitter to prevent thundering herd
+                        delay = self._retry_delays[attempt] * (0.5 + random.random())
 
-                        # Add jitter to prevent thundering herd
-                        import random
-                        delay = delay * (0.5 + random.random())
+                        # Wait at least as long as the server asks to
+                        retry_after = _retry_after_seconds(error.resp)
+                        if retry_after is not None:
+                            delay = max(delay, retry_after)
 
                         if error.resp.status == 429:
-                            self._stats['rate_limit_hits'] += 1
+                            self.increment_stat('rate_limit_hits')
                             logger.warning(
                                 f"Rate limit hit on {operation_name}. "
                                 f"Retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})"
@@ -243,81 +371,343 @@ class GmailClient:
                                 f"Retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})"
                             )
 
-                        self._stats['retries'] += 1
+                        self.increment_stat('retries')
                         time.sleep(delay)
                         continue
 
                 # Non-retryable error or max retries exceeded
                 raise
 
+    def _on_429(self) -> None:
+        """Halve the request rate after a rate limit error (multiplicative decrease)."""
+        if self.config.requests_per_second <= 0:
+            return  # Rate limiting disabled
+
+        with self._rate_lock:
+            self._throttle_ewma += THROTTLE_EWMA_ALPHA * (1.0 - self._throttle_ewma)
+            self._successes_since_change = 0
+
+            now = time.monotonic()
+            if now - self._last_decrease < RATE_DECREASE_COOLDOWN:
+                return
+            self._last_decrease = now
+
+            current = self.rate_limiter.requests_per_second
+            new_rate = max(self.config.min_requests_per_second, current / 2)
+            if new_rate < current:
+                self.rate_limiter.set_rate(new_rate)
+                logger.warning(f"Rate limited by Gmail: lowering rate to {new_rate:.1f} req/sec")
+
+    def _on_success(self, calls: int = 1) -> None:
+        """
+        Raise the request rate by 1 req/sec after sustained success (additive increase).
+
+        Args:
+            calls: Number of API calls the successful request counted as
+        """
+        if self.config.requests_per_second <= 0:
+            return  # Rate limiting disabled
+
+        with self._rate_lock:
+            self._throttle_ewma *= (1.0 - THROTTLE_EWMA_ALPHA) ** calls
+            self._successes_since_change += calls
+            if self._successes_since_change < RATE_INCREASE_AFTER:
+                return
+            self._successes_since_change = 0
+
+            current = self.rate_limiter.requests_per_second
+            if self._throttle_ewma >= RATE_INCREASE_MAX_THROTTLE:
+                return
+            new_rate = min(self.config.max_requests_per_second, current + 1)
+            if new_rate > current:
+                self.rate_limiter.set_rate(new_rate)
+                logger.debug(f"Raising rate to {new_rate:.1f} req/sec")
+
     def get_messages(self) -> Iterator[dict]:
         """
         Fetch messages from Gmail using the configured query.
 
+        Only message IDs are requested (fields mask), keeping list pages
+        small. The next page is requested in the background while the
+        current one is being consumed.
+
         Yields:
-            Message metadata dictionaries
+            Message dictionaries containing just the 'id' key
         """
+        def fetch_page(page_token: Optional[str]) -> dict:
+            # List messages with backoff
+            request = self.service.users().messages().list(
+                userId='me',
+                q=self.config.query,
+                maxResults=500,  # Max per page
+                pageToken=page_token,
+                fields='messages/id,nextPageToken'
+            )
+            return self._execute_with_backoff(request, "list messages")
+
+        max_results = self.config.max_results
+        prefetch = ThreadPoolExecutor(max_workers=1, thread_name_prefix='list')
         try:
-            page_token = None
             count = 0
+            future = prefetch.submit(fetch_page, None)
 
-            while True:
-                # List messages with backoff
-                request = self.service.users().messages().list(
-                    userId='me',
-                    q=self.config.query,
-                    maxResults=500,  # Max per page
-                    pageToken=page_token
-                )
-
-                results = self._execute_with_backoff(request, "list messages")
+            while future is not None:
+                results = future.result()
                 messages = results.get('messages', [])
 
                 if not messages:
                     break
 
+                # Start on the next page before handing out this one, unless
+                # this page already reaches max_results
+                page_token = results.get('nextPageToken')
+                future = None
+                if page_token and not (max_results and count + len(messages) >= max_results):
+                    future = prefetch.submit(fetch_page, page_token)
+
                 for msg in messages:
-                    if self.config.max_results and count >= self.config.max_results:
-                        logger.info(f"Reached max_results limit of {self.config.max_results}")
+                    if max_results and count >= max_results:
+                        logger.info(f"Reached max_results limit of {max_results}")
                         return
 
                     yield msg
                     count += 1
 
-                self._stats['total_emails'] = count
-                page_token = results.get('nextPageToken')
+                self.update_stat('total_emails', count)
+
+        except HttpError as error:
+            logger.error(f"An error occurred: {error}")
+            self.increment_stat('errors')
+            raise
+
+        finally:
+            prefetch.shutdown(wait=False, cancel_futures=True)
 
+    def get_history_id(self) -> str:
+        """
+        Get the mailbox's current history ID.
+
+        Returns:
+            historyId from the user's profile
+        """
+        request = self.service.users().getProfile(userId='me', fields='historyId')
+        return self._execute_with_backoff(request, "get profile")['historyId']
+
+    def get_added_message_ids(self, start_history_id: str) -> Optional[list[str]]:
+        """
+        List messages added to the mailbox since a history ID.
+
+        Walks users.history.list instead of listing every message, so the
+        cost scales with the number of changes. Messages added and then
+        deleted again within the range are left out.
+
+        Args:
+            start_history_id: historyId saved by an earlier run
+
+        Returns:
+            IDs of added messages in history order, or None if Gmail no
+            longer has history that far back (it keeps about a week)
+        """
+        added: dict[str, None] = {}
+        page_token = None
+
+        try:
+            while True:
+                request = self.service.users().history().list(
+                    userId='me',
+                    startHistoryId=start_history_id,
+                    historyTypes=['messageAdded', 'messageDeleted'],
+                    maxResults=500,
+                    pageToken=page_token,
+                    fields='history(messagesAdded/message/id,messagesDeleted/message/id),'
+                           'nextPageToken'
+                )
+                results = self._execute_with_backoff(request, "list history")
+
+                for record in results.get('history', []):
+                    for item in record.get('messagesAdded', []):
+                        added[item['message']['id']] = None
+                    for item in record.get('messagesDeleted', []):
+                        added.pop(item['message']['id'], None)
+
+                page_token = results.get('nextPageToken')
                 if not page_token:
                     break
 
         except HttpError as error:
+            if error.resp.status == 404:
+                logger.info("Saved history ID has expired; listing all messages instead")
+                return None
             logger.error(f"An error occurred: {error}")
-            self._stats['errors'] += 1
+            self.increment_stat('errors')
             raise
 
-    def get_message_detail(self, msg_id: str) -> dict:
+        return list(added)
+
+    def get_message_detail(self, msg_id: str, message_format: str = 'raw') -> dict:
         """
-        Fetch full message details including body and attachments.
+        Fetch a single message.
+
+        With format='raw' (the default) the RFC 822 message comes back as
+        one base64url string in the 'raw' field, attachments included.
+        With format='full' it comes back as a server-parsed MIME tree in
+        'payload', where large attachments are only referenced by
+        attachmentId and have to be fetched separately.
 
         Args:
             msg_id: Gmail message ID
+            message_format: Gmail response format ('raw', 'full' or 'minimal')
 
         Returns:
-            Full message object
+            Message object (id, threadId, labelIds, snippet, historyId,
+            sizeEstimate, plus raw or payload depending on the format)
         """
         try:
             request = self.service.users().messages().get(
                 userId='me',
                 id=msg_id,
-                format='full'
+                format=message_format
             )
             message = self._execute_with_backoff(request, f"get message {msg_id[:8]}")
             return message
         except HttpError as error:
             logger.error(f"Error fetching message {msg_id}: {error}")
-            self._stats['errors'] += 1
+            self.increment_stat('errors')
             raise
 
+    def get_message_details_batch(
+        self,
+        msg_ids: list[str],
+        message_format: str = 'raw'
+    ) -> list[dict]:
+        """
+        Fetch several messages in one batch HTTP request.
+
+        Sub-requests rejected with a retryable status (429/500/503) are
+        retried individually with backoff; other failures are logged and
+        counted as errors. The batch counts as len(msg_ids) calls against
+        the rate limiter.
+
+        Args:
+            msg_ids: Gmail message IDs (at most 100 per Gmail batch)
+            message_format: Gmail response format, see get_message_detail()
+
+        Returns:
+            Message objects in the order of msg_ids (failed ones omitted)
+        """
+        messages = {}
+        retry = []
+
+        def on_message(request_id, response, exception):
+            if exception is None:
+                messages[request_id] = response
+            elif isinstance(exception, HttpError) and exception.resp.status in [429, 500, 503]:
+                if exception.resp.status == 429:
+                    self.increment_stat('rate_limit_hits')
+                    self._on_429()
+                retry.append(request_id)
+            else:
+                logger.error(f"Error fetching message {request_id}: {exception}")
+                self.increment_stat('errors')
+
+        batch = self.service.new_batch_http_request(callback=on_message)
+        for msg_id in msg_ids:
+            batch.add(
+                self.service.users().messages().get(
+                    userId='me',
+                    id=msg_id,
+                    format=message_format
+                ),
+                request_id=msg_id
+            )
+
+        self._execute_with_backoff(
+            batch,
+            f"get {len(msg_ids)} messages",
+            cost=len(msg_ids),
+            report_success=False
+        )
+        # A batch answers HTTP 200 even when sub-requests were throttled;
+        # only the messages that came back count as successes
+        if messages:
+            self._on_success(len(messages))
+
+        for msg_id in retry:
+            self.increment_stat('retries')
+            try:
+                messages[msg_id] = self.get_message_detail(msg_id, message_format)
+            except HttpError:
+                pass  # Already logged and counted by get_message_detail
+
+        return [messages[msg_id] for msg_id in msg_ids if msg_id in messages]
+
+    def iter_message_details(self, msg_ids: Iterable[str], workers: int = 8) -> Iterator[dict]:
+        """
+        Fetch messages for a stream of IDs in parallel.
+
+        IDs are grouped into batches by _plan_fetches() and up to `workers`
+        batches are in flight at once (at most _RAW_BATCHES_IN_FLIGHT for
+        raw batches, which include attachments); the rate limiter caps the
+        combined request rate. IDs are consumed lazily, so msg_ids can be
+        the get_messages() generator.
+
+        Args:
+            msg_ids: Gmail message IDs
+            workers: Maximum concurrent batch requests
+
+        Yields:
+            Message objects in raw or full format (see _plan_fetches()),
+            as their batch completes (not in input order)
+        """
+        # batch future -> message IDs in the batch
+        pending: dict[Future, list[str]] = {}
+
+        def completed() -> Iterator[dict]:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch_ids = pending.pop(future)
+                try:
+                    messages = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching batch of {len(batch_ids)} messages: {e}")
+                    self.increment_stat('errors', len(batch_ids))
+                    continue
+                yield from messages
+
+        in_flight = workers
+        if self.config.include_attachments:
+            in_flight = min(workers, _RAW_BATCHES_IN_FLIGHT)
+
+        with ThreadPoolExecutor(max_workers=in_flight, thread_name_prefix='fetch') as pool:
+            for batch_ids, message_format in self._plan_fetches(msg_ids):
+                future = pool.submit(self.get_message_details_batch, batch_ids, message_format)
+                pending[future] = batch_ids
+                if len(pending) >= in_flight:
+                    yield from completed()
+
+            while pending:
+                yield from completed()
+
+    def _plan_fetches(self, msg_ids: Iterable[str]) -> Iterator[tuple[list[str], str]]:
+        """
+        Split a stream of message IDs into batches and pick their format.
+
+        With attachments, messages are fetched in format='raw', which
+        includes the attachments and needs no further calls. Without
+        them, format='full' is used instead: attachment data is not part
+        of that response, so it is never transferred.
+
+        Args:
+            msg_ids: Gmail message IDs
+
+        Yields:
+            (message IDs, format) for each batch request of at most
+            config.batch_size messages
+        """
+        message_format = 'raw' if self.config.include_attachments else 'full'
+        for chunk in _chunked(msg_ids, self.config.batch_size):
+            yield chunk, message_format
+
     def delete_message(self, msg_id: str) -> None:
         """
         Permanently delete a message from Gmail.
@@ -334,20 +724,108 @@ class GmailClient:
             logger.debug(f"Deleted message {msg_id}")
         except HttpError as error:
             logger.error(f"Error deleting message {msg_id}: {error}")
-            self._stats['errors'] += 1
+            self.increment_stat('errors')
             raise
 
     def get_stats(self) -> dict:
         """Get download statistics."""
-        return self._stats.copy()
+        with self._stats_lock:
+            values = self._stats.tolist()
+        return dict(zip(_STAT_NAMES, values, strict=True))
 
     def update_stat(self, key: str, value: int) -> None:
         """Update a statistic value."""
-        self._stats[key] = value
+        index = _STAT_INDEX[key]
+        with self._stats_lock:
+            self._stats[index] = value
 
     def increment_stat(self, key: str, amount: int = 1) -> None:
         """Increment a statistic counter."""
-        self._stats[key] = self._stats.get(key, 0) + amount
+        index = _STAT_INDEX[key]
+        with self._stats_lock:
+            self._stats[index] += amount
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[list[str]]:
+    """Split an iterable into lists of at most size items, consuming it lazily."""
+    chunk: list[str] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def decode_b64url(data: str) -> bytes:
+    """
+    Decode URL-safe base64 as used by the Gmail API (padding optional).
+
+    Uses pybase64 when installed, otherwise binascii directly, skipping
+    the pure-Python wrapper in the base64 module.
+
+    Args:
+        data: URL-safe base64 text
+
+    Returns:
+        Decoded bytes
+    """
+    if pybase64 is not None:
+        return pybase64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+    return binascii.a2b_base64(data.translate(_URL_SAFE_TABLE) + '=' * (-len(data) % 4))
+
+
+def _retry_after_seconds(resp) -> Optional[float]:
+    """
+    Read the Retry-After header of an error response.
+
+    Args:
+        resp: httplib2 response (dict of lower-case header names)
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    value = resp.get('retry-after')
+    if not value:
+        return None
+
+    try:
+        return float(max(int(value), 0))
+    except ValueError:
+        pass
+
+    # HTTP-date form
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max((retry_at - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+@lru_cache(maxsize=8192)
+def _parse_date_header(date_str: str) -> Optional[datetime]:
+    """
+    Parse an RFC 2822 date, keeping the header's own UTC offset.
+
+    Same date and time as email.utils.parsedate_to_datetime, but returns
+    None instead of raising. Messages in a thread or from a mailing list
+    often share Date headers, so results are cached.
+    """
+    parsed = parsedate_tz(date_str)
+    if parsed is None:
+        return None
+
+    *fields, offset = parsed
+    try:
+        if offset is None:
+            return datetime(*fields[:6])
+        return datetime(*fields[:6], tzinfo=timezone(timedelta(seconds=offset)))
+    except ValueError:
+        return None
 
 
 def parse_email_date(date_str: str) -> datetime:
@@ -360,14 +838,12 @@ def parse_email_date(date_str: str) -> datetime:
     Returns:
         Parsed datetime object
     """
-    try:
-        # Parse the date using email utils
-        from email.utils import parsedate_to_datetime
-        return parsedate_to_datetime(date_str)
-    except Exception as e:
-        logger.warning(f"Could not parse date '{date_str}': {e}")
+    date = _parse_date_header(date_str)
+    if date is None:
+        logger.warning(f"Could not parse date '{date_str}'")
         # Fallback to current time
         return datetime.now()
+    return date
 
 
 def sanitize_filename(filename: str, max_length: int = 200) -> str:
@@ -381,10 +857,16 @@ def sanitize_filename(filename: str, max_length: int = 200) -> str:
     Returns:
         Sanitized filename
     """
-    # Remove or replace unsafe characters
-    unsafe_chars = '<>:"/\\|?*\x00'
-    for char in unsafe_chars:
-        filename = filename.replace(char, '_')
+    # Replace unsafe characters in a single pass
+    filename = filename.translate(_UNSAFE_TABLE)
+
+    # Common case: short enough and nothing to strip (an empty name falls through)
+    if (
+        len(filename) <= max_length
+        and filename[:1] not in _STRIP_CHARS
+        and filename[-1:] not in _STRIP_CHARS
+    ):
+        return filename
 
     # Trim to max length
     if len(filename) > max_length:
@@ -393,6 +875,6 @@ def sanitize_filename(filename: str, max_length: int = 200) -> str:
         filename = name + ext
 
     # Remove leading/trailing dots and spaces
-    filename = filename.strip('. ')
+    filename = filename.strip(_STRIP_CHARS)
 
     return filename or 'unnamed'
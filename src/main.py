@@ -1,16 +1,21 @@
 """Main entry point for Gmail Fetcher."""
 
 import argparse
+import dataclasses
 import logging
+import queue
 import sys
-from pathlib import Path
+import threading
+from typing import TYPE_CHECKING
 
 from .config import Config
 from .gmail_client import GmailClient
 from .downloader import EmailDownloader
-from .archiver import Archiver
-from .dashboard import Dashboard
-from .status_writer import StatusWriter
+
+# Dashboard (rich), Archiver and StatusWriter are imported where they are
+# used, so runs that don't need them skip the import cost
+if TYPE_CHECKING:
+    from .status_writer import StatusWriter
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -23,6 +28,27 @@ def setup_logging(verbose: bool = False) -> None:
     )
 
 
+def _status_writer_loop(
+    updates: queue.Queue,
+    status_writer: "StatusWriter",
+    stop: threading.Event
+) -> None:
+    """
+    Write the latest queued stats to the status file every 250 ms until stopped.
+
+    Args:
+        updates: One-slot queue holding the newest stats snapshot
+        status_writer: Status file writer
+        stop: Set to end the loop
+    """
+    while not stop.wait(0.25):
+        try:
+            stats = updates.get_nowait()
+        except queue.Empty:
+            continue
+        status_writer.write_status('running', stats)
+
+
 def main() -> int:
     """Main application entry point."""
     parser = argparse.ArgumentParser(
@@ -75,6 +101,12 @@ Security Notes:
         help='Enable verbose logging'
     )
 
+    parser.add_argument(
+        '--full-resync',
+        action='store_true',
+        help='Re-download every message, ignoring the index of already-saved messages'
+    )
+
     parser.add_argument(
         '--no-auth-browser',
         action='store_true',
@@ -90,6 +122,8 @@ Security Notes:
     try:
         # Load configuration
         config = Config.from_env()
+        if args.full_resync:
+            config = dataclasses.replace(config, full_resync=True)
 
         # Validate configuration
         errors = config.validate()
@@ -122,6 +156,8 @@ Security Notes:
         # Initialize status writer for headless mode
         status_writer = None
         if args.headless:
+            from .status_writer import StatusWriter
+
             status_writer = StatusWriter(args.status_file)
             logger.info(f"Headless mode: status file at {args.status_file}")
 
@@ -132,14 +168,29 @@ Security Notes:
                 {'query': config.query, 'output_dir': str(config.output_dir)}
             )
 
-        # Progress callback for status updates
+        # Progress callback for status updates: only hands the stats to the
+        # writer thread, so no file I/O happens on the download loop
+        status_updates: queue.Queue = queue.Queue(maxsize=1)
+
         def progress_callback(stats):
-            if status_writer:
-                status_writer.write_status('running', stats)
+            try:
+                status_updates.put_nowait(stats)
+            except queue.Full:
+                # Replace the unwritten snapshot with the newer one
+                try:
+                    status_updates.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    status_updates.put_nowait(stats)
+                except queue.Full:
+                    pass
 
         # Run with dashboard, headless, or batch mode
         if args.dash and not args.headless:
             logger.info("Starting download with dashboard interface")
+            from .dashboard import Dashboard
+
             dashboard = Dashboard(config)
             stats = dashboard.run_live(downloader.download_all)
         else:
@@ -148,7 +199,19 @@ Security Notes:
 
             # Run download with progress callback if headless
             if args.headless:
-                stats = downloader.download_all(progress_callback=progress_callback)
+                stop_writer = threading.Event()
+                writer_thread = threading.Thread(
+                    target=_status_writer_loop,
+                    args=(status_updates, status_writer, stop_writer),
+                    name='status-writer',
+                    daemon=True
+                )
+                writer_thread.start()
+                try:
+                    stats = downloader.download_all(progress_callback=progress_callback)
+                finally:
+                    stop_writer.set()
+                    writer_thread.join()
             else:
                 stats = downloader.download_all()
 
@@ -157,6 +220,7 @@ Security Notes:
             logger.info("DOWNLOAD COMPLETE")
             logger.info(f"Total emails scanned: {stats['total_emails']}")
             logger.info(f"Emails downloaded: {stats['downloaded_emails']}")
+            logger.info(f"Already downloaded (skipped): {stats['skipped_emails']}")
             logger.info(f"Attachments saved: {stats['total_attachments']}")
             logger.info(f"Total size: {stats['total_size_bytes'] / (1024*1024):.2f} MB")
             logger.info(f"Errors: {stats['errors']}")
@@ -170,12 +234,16 @@ Security Notes:
         # Create archive if enabled
         if config.archive_enabled:
             logger.info("Creating archive...")
+            from .archiver import Archiver
+
             archiver = Archiver(config.output_dir.parent)
 
             archive_path = archiver.create_archive(
                 config.output_dir,
                 password=config.archive_password,
-                archive_format='zip'
+                archive_format=config.archive_format,
+                compression_level=config.archive_compression_level,
+                zstd_level=config.archive_zstd_level
             )
 
             logger.info(f"Archive created: {archive_path}")
@@ -0,0 +1,138 @@
+"""Local index of messages that have already been downloaded."""
+
+import logging
+import sqlite3
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Message IDs checked per SELECT ... IN (...) query; matches the list page size
+# and stays well under SQLite's bound-parameter limit
+_LOOKUP_CHUNK = 500
+
+# Marked messages are committed in transactions of this many rows
+_COMMIT_EVERY = 500
+
+
+class SeenIndex:
+    """
+    SQLite table of message IDs that were saved on an earlier run.
+
+    Lets incremental runs skip the per-message detail request for mail
+    that is already on disk. A small key/value meta table holds sync
+    state such as the last mailbox historyId. The index is used from a
+    single thread.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Open (or create) the index database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        # Number of IDs filter_unseen has dropped so far
+        self.skipped = 0
+        self._pending = 0
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "msg_id TEXT PRIMARY KEY, history_id TEXT, path TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.commit()
+
+    def filter_unseen(self, msg_ids: Iterable[str]) -> Iterator[str]:
+        """
+        Yield only the message IDs that are not in the index.
+
+        Args:
+            msg_ids: Gmail message IDs (consumed lazily, in chunks)
+
+        Yields:
+            IDs not seen before, in input order
+        """
+        chunk: list[str] = []
+        for msg_id in msg_ids:
+            chunk.append(msg_id)
+            if len(chunk) >= _LOOKUP_CHUNK:
+                yield from self._unseen(chunk)
+                chunk = []
+
+        if chunk:
+            yield from self._unseen(chunk)
+
+    def _unseen(self, msg_ids: list[str]) -> list[str]:
+        """Return the IDs from one chunk that are not in the index."""
+        placeholders = ",".join("?" * len(msg_ids))
+        rows = self._conn.execute(
+            f"SELECT msg_id FROM seen WHERE msg_id IN ({placeholders})",
+            msg_ids
+        )
+        seen = {row[0] for row in rows}
+        self.skipped += len(seen)
+        return [msg_id for msg_id in msg_ids if msg_id not in seen]
+
+    def mark(self, msg_id: str, history_id: Optional[str], path: str) -> None:
+        """
+        Record a saved message.
+
+        Args:
+            msg_id: Gmail message ID
+            history_id: Message historyId at download time
+            path: Directory the message was saved to
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO seen (msg_id, history_id, path) VALUES (?, ?, ?)",
+            (msg_id, history_id, path)
+        )
+        self._pending += 1
+        if self._pending >= _COMMIT_EVERY:
+            self.commit()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """
+        Read a value from the meta table.
+
+        Args:
+            key: Meta key
+
+        Returns:
+            Stored value, or None if the key is not set
+        """
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        """
+        Store a value in the meta table (committed with the next commit).
+
+        Args:
+            key: Meta key
+            value: Value to store
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, value)
+        )
+
+    def commit(self) -> None:
+        """Commit marked messages to disk."""
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        """Commit outstanding rows and close the database."""
+        try:
+            self.commit()
+        finally:
+            self._conn.close()
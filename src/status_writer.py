@@ -1,13 +1,18 @@
 """Status file writer for headless mode and external monitoring."""
 
-import json
 import logging
-from datetime import datetime
+import os
+import time
 from pathlib import Path
 from typing import Optional
 
+from .fileio import dump_json, write_bytes
+
 logger = logging.getLogger(__name__)
 
+# Statuses that are always written; other updates are rate limited
+_ALWAYS_WRITE = frozenset({'starting', 'complete', 'error'})
+
 
 class StatusWriter:
     """Writes download status to JSON file for external monitoring."""
@@ -22,6 +27,15 @@ class StatusWriter:
         self.status_file = Path(status_file)
         self.status_file.parent.mkdir(parents=True, exist_ok=True)
 
+        # Paths as strings for the os-level calls in write_status
+        self._dst = str(self.status_file)
+        self._tmp = self._dst + '.tmp'
+
+        # Progress updates arrive once per message; write at most every
+        # _min_interval seconds
+        self._min_interval = 0.25
+        self._last_write = 0.0
+
     def write_status(
         self,
         status: str,
@@ -31,25 +45,32 @@ class StatusWriter:
         """
         Write current status to file.
 
+        Updates other than 'starting', 'complete' and 'error' are skipped
+        if the previous write was less than 250 ms ago.
+
         Args:
             status: Current status string (e.g., 'running', 'complete', 'error')
             stats: Statistics dictionary
             config: Optional configuration info
         """
+        now = time.monotonic()
+        if status not in _ALWAYS_WRITE and now - self._last_write < self._min_interval:
+            return
+        self._last_write = now
+
         try:
             status_data = {
                 'status': status,
-                'timestamp': datetime.now().isoformat(),
+                # Unix epoch milliseconds
+                'timestamp_ms': time.time_ns() // 1_000_000,
                 'stats': stats,
                 'config': config or {}
             }
 
-            # Write atomically
-            temp_file = self.status_file.with_suffix('.tmp')
-            with open(temp_file, 'w') as f:
-                json.dump(status_data, f, indent=2)
-
-            temp_file.replace(self.status_file)
+            # Write atomically; fsync before the rename so a crash can't
+            # leave an empty status file behind
+            write_bytes(self._tmp, dump_json(status_data), fsync=True)
+            os.replace(self._tmp, self._dst)
 
         except Exception as e:
             logger.warning(f"Failed to write status file: {e}")
@@ -0,0 +1,57 @@
+"""Tests for the archive layout produced by Archiver."""
+
+import py7zr
+
+from src.archiver import Archiver
+
+
+def _make_email_tree(root):
+    """Create a small email directory shaped like the downloader's output."""
+    msg_dir = root / '2024' / '01' / '01' / '100000_Hello_msg00000'
+    (msg_dir / 'attachments').mkdir(parents=True)
+    (msg_dir / 'metadata.json').write_text('{"id": "msg00000"}')
+    (msg_dir / 'body.txt').write_text('plain')
+    (msg_dir / 'attachments' / 'a.pdf').write_bytes(b'%PDF')
+    return msg_dir
+
+
+def test_7z_archive_paths_are_relative_to_source_dir(tmp_path):
+    source_dir = tmp_path / 'emails'
+    _make_email_tree(source_dir)
+
+    archive_path = Archiver(tmp_path).create_archive(source_dir, zstd_level=0)
+
+    assert archive_path.suffix == '.7z'
+    with py7zr.SevenZipFile(archive_path) as archive:
+        names = set(archive.getnames())
+
+    prefix = '2024/01/01/100000_Hello_msg00000'
+    assert names == {
+        '2024',
+        '2024/01',
+        '2024/01/01',
+        prefix,
+        f'{prefix}/attachments',
+        f'{prefix}/attachments/a.pdf',
+        f'{prefix}/body.txt',
+        f'{prefix}/metadata.json',
+    }
+
+
+def test_encrypted_7z_archive_round_trips(tmp_path):
+    source_dir = tmp_path / 'emails'
+    msg_dir = _make_email_tree(source_dir)
+    extract_dir = tmp_path / 'extracted'
+
+    archive_path = Archiver(tmp_path).create_archive(
+        source_dir, password='secret', zstd_level=0
+    )
+
+    with py7zr.SevenZipFile(archive_path, password='secret') as archive:
+        assert archive.needs_password()
+        archive.extractall(extract_dir)
+
+    for file_path in msg_dir.rglob('*'):
+        if file_path.is_file():
+            extracted = extract_dir / file_path.relative_to(source_dir)
+            assert extracted.read_bytes() == file_path.read_bytes()
@@ -0,0 +1,46 @@
+"""Tests for message directory and file naming in the downloader."""
+
+import json
+
+import pytest
+
+from src.config import Config
+from src.downloader import EmailDownloader, _claim_name
+from src.gmail_client import GmailClient
+
+
+@pytest.fixture
+def downloader(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATA_DIR', str(tmp_path))
+    config = Config.from_env()
+    return EmailDownloader(config, GmailClient(config))
+
+
+def test_claim_name_numbers_repeats():
+    used_names = {'metadata.json'}
+
+    assert _claim_name(used_names, '', 'body.txt') == 'body.txt'
+    assert _claim_name(used_names, '', 'body.txt') == 'body_1.txt'
+    assert _claim_name(used_names, 'attachments/', 'body.txt') == 'body.txt'
+    assert _claim_name(used_names, 'attachments/', 'README') == 'README'
+    assert _claim_name(used_names, 'attachments/', 'README') == 'README_1'
+
+
+def test_make_message_dir_separates_colliding_messages(downloader, tmp_path):
+    prefix = str(tmp_path / '100000_Hello')
+
+    first = downloader._make_message_dir(prefix, 'abcdef0011111111')
+    second = downloader._make_message_dir(prefix, 'abcdef0022222222')
+
+    assert first == f'{prefix}_abcdef00'
+    assert second == f'{prefix}_abcdef0022222222'
+
+
+def test_make_message_dir_reuses_directory_of_same_message(downloader, tmp_path):
+    prefix = str(tmp_path / '100000_Hello')
+    msg_dir = downloader._make_message_dir(prefix, 'abcdef0011111111')
+    with open(f'{msg_dir}/metadata.json', 'w') as f:
+        json.dump({'id': 'abcdef0011111111'}, f)
+
+    assert downloader._make_message_dir(prefix, 'abcdef0011111111') == msg_dir
+    assert downloader._make_message_dir(prefix, 'abcdef0022222222') != msg_dir
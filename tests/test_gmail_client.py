@@ -0,0 +1,52 @@
+"""Tests for how GmailClient batches message fetches."""
+
+import dataclasses
+
+import pytest
+
+from src.config import Config
+from src.gmail_client import GmailClient
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATA_DIR', str(tmp_path))
+    return Config.from_env()
+
+
+def _plan(config, msg_ids, **overrides):
+    client = GmailClient(dataclasses.replace(config, **overrides))
+    return list(client._plan_fetches(msg_ids))
+
+
+def test_plan_fetches_uses_raw_format_with_attachments(config):
+    msg_ids = [f'msg{i}' for i in range(7)]
+
+    plan = _plan(config, iter(msg_ids), include_attachments=True, batch_size=3)
+
+    assert plan == [
+        (['msg0', 'msg1', 'msg2'], 'raw'),
+        (['msg3', 'msg4', 'msg5'], 'raw'),
+        (['msg6'], 'raw'),
+    ]
+
+
+def test_plan_fetches_uses_full_format_without_attachments(config):
+    msg_ids = [f'msg{i}' for i in range(4)]
+
+    plan = _plan(config, msg_ids, include_attachments=False, batch_size=2)
+
+    assert plan == [(['msg0', 'msg1'], 'full'), (['msg2', 'msg3'], 'full')]
+
+
+def test_plan_fetches_honors_batch_size(config):
+    msg_ids = [f'msg{i}' for i in range(250)]
+
+    plan = _plan(config, msg_ids, batch_size=100)
+
+    assert [len(batch_ids) for batch_ids, _ in plan] == [100, 100, 50]
+    assert [msg_id for batch_ids, _ in plan for msg_id in batch_ids] == msg_ids
+
+
+def test_plan_fetches_with_no_ids(config):
+    assert _plan(config, []) == []
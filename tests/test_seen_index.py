@@ -0,0 +1,40 @@
+"""Tests for the SQLite index of downloaded messages."""
+
+from src.seen_index import SeenIndex
+
+
+def test_filter_unseen_drops_marked_ids_and_counts_them(tmp_path):
+    index = SeenIndex(tmp_path / 'seen.db')
+    index.mark('a', '10', '/data/a')
+    index.mark('c', None, '/data/c')
+
+    assert list(index.filter_unseen(['a', 'b', 'c', 'd'])) == ['b', 'd']
+    assert index.skipped == 2
+    index.close()
+
+
+def test_filter_unseen_spans_lookup_chunks(tmp_path):
+    index = SeenIndex(tmp_path / 'seen.db')
+    msg_ids = [f'msg{i:05d}' for i in range(1234)]
+    for msg_id in msg_ids[::3]:
+        index.mark(msg_id, None, '')
+
+    assert list(index.filter_unseen(iter(msg_ids))) == [
+        msg_id for i, msg_id in enumerate(msg_ids) if i % 3
+    ]
+    assert index.skipped == len(msg_ids[::3])
+    index.close()
+
+
+def test_marks_and_meta_persist_across_reopen(tmp_path):
+    db_path = tmp_path / 'state' / 'seen.db'
+    index = SeenIndex(db_path)
+    index.mark('a', '10', '/data/a')
+    index.set_meta('history_id:in:anywhere', '12345')
+    index.close()
+
+    index = SeenIndex(db_path)
+    assert list(index.filter_unseen(['a', 'b'])) == ['b']
+    assert index.get_meta('history_id:in:anywhere') == '12345'
+    assert index.get_meta('missing') is None
+    index.close()